@@ -30,12 +30,12 @@ use ratatui::{
 };
 use serde::{Deserialize, Serialize};
 use std::{
-    collections::hash_map::DefaultHasher,
+    collections::{hash_map::RandomState, HashMap},
     fs,
-    hash::{Hash, Hasher},
-    io::{self, stdout},
-    path::PathBuf,
-    time::{Duration, Instant},
+    hash::{BuildHasher, Hash, Hasher},
+    io::{self, stdout, Write},
+    path::{Path, PathBuf},
+    time::{Duration, Instant, SystemTime},
 };
 
 // ============================================================================
@@ -81,6 +81,8 @@ enum AppMode {
 struct App {
     mode: AppMode,
     library: Library,
+    // Book ID -> index into `library.books`
+    book_index: HashMap<String, usize>,
     words: Vec<String>,
     word_index: usize,
     current_book_id: Option<String>,
@@ -89,6 +91,10 @@ struct App {
     wpm: u32,
     last_advance: Instant,
 
+    // Pending library writes, flushed at most every SAVE_INTERVAL
+    library_dirty: bool,
+    last_save: Instant,
+
     // Library browser state
     library_state: ListState,
 
@@ -103,6 +109,9 @@ struct App {
 
     // Status message
     status_message: Option<(String, Instant)>,
+
+    // Set whenever visible state changes; the main loop skips drawing otherwise
+    needs_redraw: bool,
 }
 
 #[derive(Debug, Clone)]
@@ -134,9 +143,18 @@ fn ensure_config_dirs() -> io::Result<()> {
     Ok(())
 }
 
+/// Map each book ID to its position in `books`
+fn index_books(books: &[Book]) -> HashMap<String, usize> {
+    books
+        .iter()
+        .enumerate()
+        .map(|(i, book)| (book.id.clone(), i))
+        .collect()
+}
+
 fn load_library() -> Library {
-    if let Ok(content) = fs::read_to_string(library_file()) {
-        serde_json::from_str(&content).unwrap_or_default()
+    if let Ok(content) = fs::read(library_file()) {
+        serde_json::from_slice(&content).unwrap_or_default()
     } else {
         Library::default()
     }
@@ -144,8 +162,17 @@ fn load_library() -> Library {
 
 fn save_library(library: &Library) {
     let _ = ensure_config_dirs();
-    if let Ok(content) = serde_json::to_string_pretty(library) {
-        let _ = fs::write(library_file(), content);
+    if let Ok(content) = serde_json::to_vec_pretty(library) {
+        // Write to a temp file and rename it over the library so an
+        // interrupted save can never leave a truncated file behind
+        let tmp = library_file().with_extension("json.tmp");
+        let written = fs::File::create(&tmp).and_then(|mut f| {
+            f.write_all(&content)?;
+            f.sync_all()
+        });
+        if written.is_ok() {
+            let _ = fs::rename(&tmp, library_file());
+        }
     }
 }
 
@@ -157,30 +184,33 @@ fn tokenize_text(text: &str) -> Vec<String> {
     text.split_whitespace().map(|s| s.to_string()).collect()
 }
 
+/// ORP index by word length in chars; anything longer uses 4
+const ORP_BY_LEN: [usize; 14] = [0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3];
+
 /// Calculate the Optimal Recognition Point (ORP) for a word
 fn calculate_orp(word: &str) -> usize {
-    let len = word.chars().count();
-    match len {
-        0..=1 => 0,
-        2..=5 => 1,
-        6..=9 => 2,
-        10..=13 => 3,
-        _ => 4,
-    }
+    // Longer words all share the last ORP, so stop counting past the table
+    let len = word.chars().take(ORP_BY_LEN.len()).count();
+    ORP_BY_LEN.get(len).copied().unwrap_or(4)
 }
 
 // ============================================================================
 // App Implementation
 // ============================================================================
 
+/// Minimum time between debounced library writes
+const SAVE_INTERVAL: Duration = Duration::from_secs(2);
+
 impl App {
     fn new() -> Self {
         let library = load_library();
         let wpm = library.settings.wpm;
+        let book_index = index_books(&library.books);
 
         Self {
             mode: AppMode::Reading,
             library,
+            book_index,
             words: Vec::new(),
             word_index: 0,
             current_book_id: None,
@@ -188,6 +218,8 @@ impl App {
             is_playing: false,
             wpm,
             last_advance: Instant::now(),
+            library_dirty: false,
+            last_save: Instant::now(),
             library_state: ListState::default(),
             file_input: String::new(),
             file_input_cursor: 0,
@@ -195,11 +227,28 @@ impl App {
             confirm_message: String::new(),
             confirm_action: None,
             status_message: None,
+            needs_redraw: true,
         }
     }
 
     fn show_status(&mut self, msg: &str) {
         self.status_message = Some((msg.to_string(), Instant::now()));
+        self.needs_redraw = true;
+    }
+
+    /// Record that the library changed; the write happens in `flush_library`
+    fn mark_library_dirty(&mut self) {
+        self.library_dirty = true;
+    }
+
+    /// Write pending library changes if the last save is old enough, or
+    /// immediately when `force` is set
+    fn flush_library(&mut self, force: bool) {
+        if self.library_dirty && (force || self.last_save.elapsed() >= SAVE_INTERVAL) {
+            save_library(&self.library);
+            self.library_dirty = false;
+            self.last_save = Instant::now();
+        }
     }
 
     fn load_last_book(&mut self) {
@@ -226,7 +275,7 @@ impl App {
         }
 
         // Find book info
-        if let Some(book) = self.library.books.iter().find(|b| b.id == book_id) {
+        if let Some(book) = self.book_index.get(book_id).map(|&i| &self.library.books[i]) {
             self.current_book_title = book.title.clone();
             self.word_index = book.progress.min(self.words.len().saturating_sub(1));
         } else {
@@ -236,7 +285,7 @@ impl App {
 
         self.current_book_id = Some(book_id.to_string());
         self.library.last_book = Some(book_id.to_string());
-        save_library(&self.library);
+        self.mark_library_dirty();
 
         true
     }
@@ -258,11 +307,7 @@ impl App {
             return false;
         }
 
-        // Generate unique ID
-        let mut hasher = DefaultHasher::new();
-        path.hash(&mut hasher);
-        std::time::SystemTime::now().hash(&mut hasher);
-        let book_id = format!("{:x}", hasher.finish())[..12].to_string();
+        let book_id = generate_book_id(&path);
 
         // Save to books directory
         let _ = ensure_config_dirs();
@@ -288,20 +333,28 @@ impl App {
             progress: 0,
         };
         self.library.books.push(book);
-        save_library(&self.library);
+        self.book_index = index_books(&self.library.books);
+        self.mark_library_dirty();
 
         self.show_status(&format!("Imported: {} ({} words)", title, words.len()));
         self.load_book(&book_id);
+        // Flush after load_book so the new last_book goes out in the same write
+        self.flush_library(true);
 
         true
     }
 
     fn save_progress(&mut self) {
         if let Some(ref book_id) = self.current_book_id {
-            if let Some(book) = self.library.books.iter_mut().find(|b| b.id == *book_id) {
+            if let Some(&i) = self.book_index.get(book_id) {
+                let book = &mut self.library.books[i];
+                // Nothing to write if the position hasn't moved since the last save
+                if book.progress == self.word_index {
+                    return;
+                }
                 book.progress = self.word_index;
             }
-            save_library(&self.library);
+            self.mark_library_dirty();
         }
     }
 
@@ -310,16 +363,24 @@ impl App {
         if let Some((_, instant)) = &self.status_message {
             if instant.elapsed() > Duration::from_secs(3) {
                 self.status_message = None;
+                self.needs_redraw = true;
             }
         }
 
         // Advance word if playing
         if self.is_playing && !self.words.is_empty() {
-            let delay = Duration::from_secs_f64(60.0 / self.wpm as f64);
+            let delay = self.word_delay();
             if self.last_advance.elapsed() >= delay {
-                self.last_advance = Instant::now();
+                // Step the deadline forward instead of restarting it from now, so
+                // tick jitter doesn't accumulate and drag the real rate below the WPM
+                self.last_advance += delay;
+                if self.last_advance.elapsed() >= delay {
+                    // More than a word behind (e.g. after a stall): re-anchor
+                    self.last_advance = Instant::now();
+                }
                 if self.word_index < self.words.len() - 1 {
                     self.word_index += 1;
+                    self.needs_redraw = true;
                     // Save progress every 10 words
                     if self.word_index % 10 == 0 {
                         self.save_progress();
@@ -331,6 +392,23 @@ impl App {
                 }
             }
         }
+
+        self.flush_library(false);
+    }
+
+    /// Time each word stays on screen at the current WPM
+    fn word_delay(&self) -> Duration {
+        Duration::from_secs_f64(60.0 / self.wpm as f64)
+    }
+
+    /// How long the event loop may block before the next word is due
+    fn poll_timeout(&self) -> Duration {
+        let idle = Duration::from_millis(50);
+        if self.is_playing {
+            self.word_delay().saturating_sub(self.last_advance.elapsed()).min(idle)
+        } else {
+            idle
+        }
     }
 
     fn current_word(&self) -> Option<&str> {
@@ -346,6 +424,16 @@ impl App {
     }
 }
 
+/// Generate a unique 12-hex-digit ID for an imported book
+fn generate_book_id(path: &Path) -> String {
+    // RandomState is keyed from OS randomness, so two imports of the same
+    // path within one clock tick still get distinct IDs
+    let mut hasher = RandomState::new().build_hasher();
+    path.hash(&mut hasher);
+    SystemTime::now().hash(&mut hasher);
+    format!("{:012x}", hasher.finish() >> 16)
+}
+
 fn shellexpand(path: &str) -> String {
     if path.starts_with('~') {
         if let Some(home) = dirs::home_dir() {
@@ -393,11 +481,13 @@ fn ui(f: &mut Frame, app: &App) {
         );
     f.render_widget(title, chunks[0]);
 
+    // Progress is shared by the gauge and the stats line, so compute it once
+    let progress = app.progress_percent();
+
     // Word display
     render_word_display(f, app, chunks[1]);
 
     // Progress bar
-    let progress = app.progress_percent();
     let gauge = Gauge::default()
         .gauge_style(
             Style::default()
@@ -409,7 +499,7 @@ fn ui(f: &mut Frame, app: &App) {
     f.render_widget(gauge, chunks[2]);
 
     // Stats bar
-    render_stats(f, app, chunks[3]);
+    render_stats(f, app, progress, chunks[3]);
 
     // Modal overlays
     match app.mode {
@@ -452,16 +542,15 @@ fn render_word_display(f: &mut Frame, app: &App, area: Rect) {
 
     if let Some(word) = app.current_word() {
         let orp = calculate_orp(word);
-        let chars: Vec<char> = word.chars().collect();
 
-        // Split word into three parts
-        let before: String = chars[..orp].iter().collect();
-        let orp_char: String = chars.get(orp).map(|c| c.to_string()).unwrap_or_default();
-        let after: String = if orp + 1 < chars.len() {
-            chars[orp + 1..].iter().collect()
-        } else {
-            String::new()
-        };
+        // Split word into three borrowed parts at the ORP character's byte
+        // offsets, so drawing a frame doesn't allocate
+        let mut bounds = word.char_indices().map(|(i, _)| i).skip(orp);
+        let orp_start = bounds.next().unwrap_or(word.len());
+        let orp_end = bounds.next().unwrap_or(word.len());
+        let before = &word[..orp_start];
+        let orp_char = &word[orp_start..orp_end];
+        let after = &word[orp_end..];
 
         // ORP character is always at center_x
         // Render each part as a separate widget to avoid styling issues
@@ -469,20 +558,20 @@ fn render_word_display(f: &mut Frame, app: &App, area: Rect) {
         // Before ORP (right-aligned to center)
         if !before.is_empty() {
             let before_x = center_x.saturating_sub(before.len() as u16);
-            let before_widget = Paragraph::new(before.clone())
+            let before_widget = Paragraph::new(before)
                 .style(Style::default().fg(Color::White));
             f.render_widget(before_widget, Rect::new(before_x, center_y, before.len() as u16, 1));
         }
 
         // ORP character (at center, in red)
-        let orp_widget = Paragraph::new(orp_char.clone())
+        let orp_widget = Paragraph::new(orp_char)
             .style(Style::default().fg(Color::Red));
         f.render_widget(orp_widget, Rect::new(center_x, center_y, 1, 1));
 
         // After ORP (left-aligned from center+1)
         if !after.is_empty() {
             let after_x = center_x + 1;
-            let after_widget = Paragraph::new(after.clone())
+            let after_widget = Paragraph::new(after)
                 .style(Style::default().fg(Color::White));
             f.render_widget(after_widget, Rect::new(after_x, center_y, after.len() as u16, 1));
         }
@@ -496,7 +585,7 @@ fn render_word_display(f: &mut Frame, app: &App, area: Rect) {
     }
 }
 
-fn render_stats(f: &mut Frame, app: &App, area: Rect) {
+fn render_stats(f: &mut Frame, app: &App, progress: f64, area: Rect) {
     let status = if app.is_playing {
         "Playing"
     } else {
@@ -520,7 +609,7 @@ fn render_stats(f: &mut Frame, app: &App, area: Rect) {
         ),
         Span::raw("| "),
         Span::styled(
-            format!("Progress: {:.1}% ", app.progress_percent()),
+            format!("Progress: {:.1}% ", progress),
             Style::default().fg(Color::Magenta),
         ),
         Span::raw("| "),
@@ -565,9 +654,15 @@ fn render_library(f: &mut Frame, app: &App, size: Rect) {
             .alignment(Alignment::Center);
         f.render_widget(text, inner);
     } else {
-        let items: Vec<ListItem> = app
-            .library
-            .books
+        // Only build items for the rows that fit, scrolled so the selection
+        // stays on the last visible row (what List does from a zero offset)
+        let count = app.library.books.len();
+        let height = (inner.height as usize).max(1);
+        let selected = app.library_state.selected().map(|i| i.min(count - 1));
+        let start = selected.unwrap_or(0).saturating_sub(height - 1);
+        let end = (start + height).min(count);
+
+        let items: Vec<ListItem> = app.library.books[start..end]
             .iter()
             .map(|book| {
                 let marker = if Some(&book.id) == app.current_book_id.as_ref() {
@@ -606,7 +701,7 @@ fn render_library(f: &mut Frame, app: &App, size: Rect) {
             .highlight_symbol("-> ");
 
         // Need to render with state for highlighting
-        let mut state = app.library_state.clone();
+        let mut state = ListState::default().with_selected(selected.map(|i| i - start));
         f.render_stateful_widget(list, inner, &mut state);
     }
 
@@ -860,8 +955,11 @@ fn centered_rect(percent_x: u16, percent_y: u16, r: Rect) -> Rect {
 // ============================================================================
 
 fn handle_events(app: &mut App) -> io::Result<bool> {
-    if event::poll(Duration::from_millis(50))? {
-        if let Event::Key(key) = event::read()? {
+    if event::poll(app.poll_timeout())? {
+        let ev = event::read()?;
+        // Any input (including a resize) may change what's on screen
+        app.needs_redraw = true;
+        if let Event::Key(key) = ev {
             match app.mode {
                 AppMode::Reading => return handle_reading_keys(app, key.code, key.modifiers),
                 AppMode::Library => handle_library_keys(app, key.code),
@@ -896,7 +994,7 @@ fn handle_reading_keys(app: &mut App, code: KeyCode, modifiers: KeyModifiers) ->
             };
             app.wpm = (app.wpm + increment).min(2000);
             app.library.settings.wpm = app.wpm;
-            save_library(&app.library);
+            app.mark_library_dirty();
             app.show_status(&format!("Speed: {} WPM", app.wpm));
         }
         KeyCode::Down | KeyCode::Char('j') => {
@@ -907,7 +1005,7 @@ fn handle_reading_keys(app: &mut App, code: KeyCode, modifiers: KeyModifiers) ->
             };
             app.wpm = app.wpm.saturating_sub(decrement).max(50);
             app.library.settings.wpm = app.wpm;
-            save_library(&app.library);
+            app.mark_library_dirty();
             app.show_status(&format!("Speed: {} WPM", app.wpm));
         }
         KeyCode::Left | KeyCode::Char('h') => {
@@ -1080,19 +1178,19 @@ fn handle_confirm_keys(app: &mut App, code: KeyCode) {
 
                         // Get the title for the message
                         let title = app
-                            .library
-                            .books
-                            .iter()
-                            .find(|b| b.id == book_id)
-                            .map(|b| b.title.clone())
+                            .book_index
+                            .get(&book_id)
+                            .map(|&i| app.library.books[i].title.clone())
                             .unwrap_or_default();
 
                         // Remove from library
                         app.library.books.retain(|b| b.id != book_id);
+                        app.book_index = index_books(&app.library.books);
                         if app.library.last_book.as_ref() == Some(&book_id) {
                             app.library.last_book = None;
                         }
-                        save_library(&app.library);
+                        app.mark_library_dirty();
+                        app.flush_library(true);
 
                         // Remove file
                         let book_file = books_dir().join(format!("{}.txt", book_id));
@@ -1140,6 +1238,10 @@ fn main() -> io::Result<()> {
     // Main loop
     let result = run_app(&mut terminal, &mut app);
 
+    // Save progress before restoring the terminal, whose calls can bail out early
+    app.save_progress();
+    app.flush_library(true);
+
     // Restore terminal
     disable_raw_mode()?;
     execute!(
@@ -1149,9 +1251,6 @@ fn main() -> io::Result<()> {
     )?;
     terminal.show_cursor()?;
 
-    // Save progress before exit
-    app.save_progress();
-
     result
 }
 
@@ -1160,7 +1259,10 @@ fn run_app<B: ratatui::backend::Backend>(
     app: &mut App,
 ) -> io::Result<()> {
     loop {
-        terminal.draw(|f| ui(f, app))?;
+        if app.needs_redraw {
+            terminal.draw(|f| ui(f, app))?;
+            app.needs_redraw = false;
+        }
         app.tick();
 
         if handle_events(app)? {
@@ -8,17 +8,20 @@
 //!   O           - Open file
 //!   Escape      - Quit
 
+use iced::event::{self, Event};
 use iced::keyboard::{self, Key};
 use iced::theme::{self, Theme};
 use iced::time;
 use iced::widget::{button, column, container, row, text, Space};
+use iced::window;
 use iced::{executor, Application, Color, Command, Element, Font, Length, Settings, Subscription};
 use serde::{Deserialize, Serialize};
-use std::collections::hash_map::DefaultHasher;
+use std::collections::{hash_map::RandomState, HashMap};
 use std::fs;
-use std::hash::{Hash, Hasher};
-use std::path::PathBuf;
-use std::time::{Duration, Instant};
+use std::hash::{BuildHasher, Hash, Hasher};
+use std::io::{self, Write};
+use std::path::{Path, PathBuf};
+use std::time::{Duration, Instant, SystemTime};
 
 // ============================================================================
 // Configuration
@@ -38,7 +41,7 @@ fn books_dir() -> PathBuf {
     config_dir().join("books")
 }
 
-fn ensure_config_dirs() -> std::io::Result<()> {
+fn ensure_config_dirs() -> io::Result<()> {
     fs::create_dir_all(config_dir())?;
     fs::create_dir_all(books_dir())?;
     Ok(())
@@ -63,9 +66,18 @@ struct Library {
     wpm: u32,
 }
 
+/// Map each book ID to its position in `books`
+fn index_books(books: &[Book]) -> HashMap<String, usize> {
+    books
+        .iter()
+        .enumerate()
+        .map(|(i, book)| (book.id.clone(), i))
+        .collect()
+}
+
 fn load_library() -> Library {
-    if let Ok(content) = fs::read_to_string(library_file()) {
-        serde_json::from_str(&content).unwrap_or_else(|_| Library {
+    if let Ok(content) = fs::read(library_file()) {
+        serde_json::from_slice(&content).unwrap_or_else(|_| Library {
             wpm: 300,
             ..Default::default()
         })
@@ -79,8 +91,17 @@ fn load_library() -> Library {
 
 fn save_library(library: &Library) {
     let _ = ensure_config_dirs();
-    if let Ok(content) = serde_json::to_string_pretty(library) {
-        let _ = fs::write(library_file(), content);
+    if let Ok(content) = serde_json::to_vec_pretty(library) {
+        // Write to a temp file and rename it over the library so an
+        // interrupted save can never leave a truncated file behind
+        let tmp = library_file().with_extension("json.tmp");
+        let written = fs::File::create(&tmp).and_then(|mut f| {
+            f.write_all(&content)?;
+            f.sync_all()
+        });
+        if written.is_ok() {
+            let _ = fs::rename(&tmp, library_file());
+        }
     }
 }
 
@@ -88,30 +109,89 @@ fn save_library(library: &Library) {
 // ORP Calculation
 // ============================================================================
 
+/// ORP index by word length in chars; anything longer uses 4
+const ORP_BY_LEN: [usize; 14] = [0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3];
+
 fn calculate_orp(word: &str) -> usize {
-    let len = word.chars().count();
-    match len {
-        0..=1 => 0,
-        2..=5 => 1,
-        6..=9 => 2,
-        10..=13 => 3,
-        _ => 4,
-    }
+    // Longer words all share the last ORP, so stop counting past the table
+    let len = word.chars().take(ORP_BY_LEN.len()).count();
+    ORP_BY_LEN.get(len).copied().unwrap_or(4)
 }
 
 fn tokenize_text(text: &str) -> Vec<String> {
     text.split_whitespace().map(|s| s.to_string()).collect()
 }
 
+/// Generate a unique 12-hex-digit ID for an imported book
+fn generate_book_id(path: &Path) -> String {
+    // RandomState is keyed from OS randomness, so two imports of the same
+    // path within one clock tick still get distinct IDs
+    let mut hasher = RandomState::new().build_hasher();
+    path.hash(&mut hasher);
+    SystemTime::now().hash(&mut hasher);
+    format!("{:012x}", hasher.finish() >> 16)
+}
+
+/// Read and tokenize a saved book. Like `import_book`, runs on a blocking
+/// thread.
+fn read_book(book_id: &str) -> Option<Vec<String>> {
+    let book_file = books_dir().join(format!("{}.txt", book_id));
+    let content = fs::read_to_string(&book_file).ok()?;
+
+    let words = tokenize_text(&content);
+    if words.is_empty() {
+        return None;
+    }
+    Some(words)
+}
+
+/// Read and tokenize a file and copy it into the books directory. Runs on a
+/// blocking thread, so it only touches the filesystem, never app state.
+fn import_book(path: &Path) -> Result<(Book, Vec<String>), String> {
+    let content = fs::read_to_string(path).map_err(|e| format!("Error: {}", e))?;
+
+    let words = tokenize_text(&content);
+    if words.is_empty() {
+        return Err("File is empty".to_string());
+    }
+
+    let book_id = generate_book_id(path);
+
+    let _ = ensure_config_dirs();
+    let book_file = books_dir().join(format!("{}.txt", book_id));
+    if fs::write(&book_file, &content).is_err() {
+        return Err("Failed to save book".to_string());
+    }
+
+    let title = path
+        .file_stem()
+        .and_then(|s| s.to_str())
+        .unwrap_or("Unknown")
+        .to_string();
+
+    let book = Book {
+        id: book_id,
+        title,
+        total_words: words.len(),
+        progress: 0,
+    };
+    Ok((book, words))
+}
+
 // ============================================================================
 // Application
 // ============================================================================
 
+/// Minimum time between debounced library writes
+const SAVE_INTERVAL: Duration = Duration::from_secs(2);
+
 pub fn main() -> iced::Result {
     RSVPApp::run(Settings {
         window: iced::window::Settings {
             size: iced::Size::new(800.0, 500.0),
             min_size: Some(iced::Size::new(600.0, 400.0)),
+            // Handled in update() so pending library writes are flushed first
+            exit_on_close_request: false,
             ..Default::default()
         },
         antialiasing: true,
@@ -130,11 +210,16 @@ enum Message {
     Reset,
     OpenFile,
     FileOpened(Option<PathBuf>),
+    BookImported(Result<(Book, Vec<String>), String>),
+    BookLoaded(String, Option<Vec<String>>),
     KeyPressed(Key),
+    CloseRequested,
 }
 
 struct RSVPApp {
     library: Library,
+    // Book ID -> index into `library.books`
+    book_index: HashMap<String, usize>,
     words: Vec<String>,
     word_index: usize,
     current_book_id: Option<String>,
@@ -142,6 +227,9 @@ struct RSVPApp {
     is_playing: bool,
     wpm: u32,
     last_tick: Instant,
+    // Pending library writes, flushed at most every SAVE_INTERVAL
+    library_dirty: bool,
+    last_save: Instant,
     status_message: Option<String>,
 }
 
@@ -154,9 +242,11 @@ impl Application for RSVPApp {
     fn new(_flags: ()) -> (Self, Command<Message>) {
         let library = load_library();
         let wpm = if library.wpm > 0 { library.wpm } else { 300 };
+        let book_index = index_books(&library.books);
 
-        let mut app = Self {
+        let app = Self {
             library,
+            book_index,
             words: Vec::new(),
             word_index: 0,
             current_book_id: None,
@@ -164,15 +254,28 @@ impl Application for RSVPApp {
             is_playing: false,
             wpm,
             last_tick: Instant::now(),
+            library_dirty: false,
+            last_save: Instant::now(),
             status_message: Some("Press O to open a file, Space to play/pause".to_string()),
         };
 
-        // Load last book if available
-        if let Some(book_id) = app.library.last_book.clone() {
-            app.load_book(&book_id);
-        }
+        // Load last book if available, off the GUI thread like imports
+        let command = match app.library.last_book.clone() {
+            Some(book_id) => Command::perform(
+                async move {
+                    let id = book_id.clone();
+                    let words = tokio::task::spawn_blocking(move || read_book(&id))
+                        .await
+                        .ok()
+                        .flatten();
+                    (book_id, words)
+                },
+                |(book_id, words)| Message::BookLoaded(book_id, words),
+            ),
+            None => Command::none(),
+        };
 
-        (app, Command::none())
+        (app, command)
     }
 
     fn title(&self) -> String {
@@ -187,9 +290,15 @@ impl Application for RSVPApp {
         match message {
             Message::Tick => {
                 if self.is_playing && !self.words.is_empty() {
-                    let delay = Duration::from_secs_f64(60.0 / self.wpm as f64);
+                    let delay = self.word_delay();
                     if self.last_tick.elapsed() >= delay {
-                        self.last_tick = Instant::now();
+                        // Step the deadline forward instead of restarting it from now, so
+                        // tick jitter doesn't accumulate and drag the real rate below the WPM
+                        self.last_tick += delay;
+                        if self.last_tick.elapsed() >= delay {
+                            // More than a word behind (e.g. after a stall): re-anchor
+                            self.last_tick = Instant::now();
+                        }
                         if self.word_index < self.words.len() - 1 {
                             self.word_index += 1;
                             if self.word_index % 10 == 0 {
@@ -202,6 +311,7 @@ impl Application for RSVPApp {
                         }
                     }
                 }
+                self.flush_library(false);
             }
             Message::TogglePlay => {
                 if !self.words.is_empty() {
@@ -216,13 +326,13 @@ impl Application for RSVPApp {
             Message::SpeedUp => {
                 self.wpm = (self.wpm + 50).min(2000);
                 self.library.wpm = self.wpm;
-                save_library(&self.library);
+                self.mark_library_dirty();
                 self.status_message = Some(format!("{} WPM", self.wpm));
             }
             Message::SpeedDown => {
                 self.wpm = self.wpm.saturating_sub(50).max(50);
                 self.library.wpm = self.wpm;
-                save_library(&self.library);
+                self.mark_library_dirty();
                 self.status_message = Some(format!("{} WPM", self.wpm));
             }
             Message::PrevWord => {
@@ -255,9 +365,37 @@ impl Application for RSVPApp {
             }
             Message::FileOpened(path) => {
                 if let Some(path) = path {
-                    self.import_file(&path);
+                    // Read, tokenize and copy the file on a blocking thread so
+                    // a large book doesn't freeze the window while it imports
+                    return Command::perform(
+                        async move {
+                            tokio::task::spawn_blocking(move || import_book(&path))
+                                .await
+                                .unwrap_or_else(|e| Err(format!("Error: {}", e)))
+                        },
+                        Message::BookImported,
+                    );
+                }
+            }
+            Message::BookImported(result) => match result {
+                Ok((book, words)) => {
+                    self.add_book(book, words);
+                }
+                Err(e) => {
+                    self.status_message = Some(e);
+                }
+            },
+            Message::BookLoaded(book_id, words) => {
+                // Don't replace a book the user opened while this one loaded
+                if let Some(words) = words.filter(|_| self.current_book_id.is_none()) {
+                    self.open_words(&book_id, words);
                 }
             }
+            Message::CloseRequested => {
+                self.save_progress();
+                self.flush_library(true);
+                return window::close(window::Id::MAIN);
+            }
             Message::KeyPressed(key) => match key.as_ref() {
                 Key::Named(keyboard::key::Named::Space) => {
                     return self.update(Message::TogglePlay);
@@ -275,7 +413,7 @@ impl Application for RSVPApp {
                     return self.update(Message::NextWord);
                 }
                 Key::Named(keyboard::key::Named::Escape) => {
-                    std::process::exit(0);
+                    return self.update(Message::CloseRequested);
                 }
                 Key::Character(c) => {
                     let s: &str = c.as_ref();
@@ -451,14 +589,24 @@ impl Application for RSVPApp {
 
     fn subscription(&self) -> Subscription<Message> {
         let tick = if self.is_playing {
-            time::every(Duration::from_millis(10)).map(|_| Message::Tick)
+            // Wake a few times per word rather than at a fixed 10 ms, so a
+            // word is never shown late by more than a quarter of its interval
+            let interval = (self.word_delay() / 4).max(Duration::from_millis(10));
+            time::every(interval).map(|_| Message::Tick)
+        } else if self.library_dirty {
+            time::every(SAVE_INTERVAL).map(|_| Message::Tick)
         } else {
             Subscription::none()
         };
 
         let keys = keyboard::on_key_press(|key, _modifiers| Some(Message::KeyPressed(key)));
 
-        Subscription::batch([tick, keys])
+        let close = event::listen_with(|event, _status| match event {
+            Event::Window(_, window::Event::CloseRequested) => Some(Message::CloseRequested),
+            _ => None,
+        });
+
+        Subscription::batch([tick, keys, close])
     }
 
     fn theme(&self) -> Theme {
@@ -467,20 +615,31 @@ impl Application for RSVPApp {
 }
 
 impl RSVPApp {
-    fn load_book(&mut self, book_id: &str) -> bool {
-        let book_file = books_dir().join(format!("{}.txt", book_id));
+    /// Time each word stays on screen at the current WPM
+    fn word_delay(&self) -> Duration {
+        Duration::from_secs_f64(60.0 / self.wpm as f64)
+    }
 
-        let content = match fs::read_to_string(&book_file) {
-            Ok(c) => c,
-            Err(_) => return false,
-        };
+    /// Record that the library changed; the write happens in `flush_library`
+    fn mark_library_dirty(&mut self) {
+        self.library_dirty = true;
+    }
 
-        self.words = tokenize_text(&content);
-        if self.words.is_empty() {
-            return false;
+    /// Write pending library changes if the last save is old enough, or
+    /// immediately when `force` is set
+    fn flush_library(&mut self, force: bool) {
+        if self.library_dirty && (force || self.last_save.elapsed() >= SAVE_INTERVAL) {
+            save_library(&self.library);
+            self.library_dirty = false;
+            self.last_save = Instant::now();
         }
+    }
+
+    /// Make `words` the current text, resuming at the book's saved position
+    fn open_words(&mut self, book_id: &str, words: Vec<String>) {
+        self.words = words;
 
-        if let Some(book) = self.library.books.iter().find(|b| b.id == book_id) {
+        if let Some(book) = self.book_index.get(book_id).map(|&i| &self.library.books[i]) {
             self.current_book_title = book.title.clone();
             self.word_index = book.progress.min(self.words.len().saturating_sub(1));
         } else {
@@ -490,65 +649,31 @@ impl RSVPApp {
 
         self.current_book_id = Some(book_id.to_string());
         self.library.last_book = Some(book_id.to_string());
-        save_library(&self.library);
-
-        true
+        self.mark_library_dirty();
     }
 
-    fn import_file(&mut self, path: &PathBuf) -> bool {
-        let content = match fs::read_to_string(path) {
-            Ok(c) => c,
-            Err(e) => {
-                self.status_message = Some(format!("Error: {}", e));
-                return false;
-            }
-        };
+    /// Register a book produced by `import_book` and start reading it
+    fn add_book(&mut self, book: Book, words: Vec<String>) {
+        let book_id = book.id.clone();
+        self.status_message = Some(format!("Loaded: {} ({} words)", book.title, words.len()));
 
-        let words = tokenize_text(&content);
-        if words.is_empty() {
-            self.status_message = Some("File is empty".to_string());
-            return false;
-        }
-
-        let mut hasher = DefaultHasher::new();
-        path.hash(&mut hasher);
-        std::time::SystemTime::now().hash(&mut hasher);
-        let book_id = format!("{:x}", hasher.finish())[..12].to_string();
-
-        let _ = ensure_config_dirs();
-        let book_file = books_dir().join(format!("{}.txt", book_id));
-        if fs::write(&book_file, &content).is_err() {
-            self.status_message = Some("Failed to save book".to_string());
-            return false;
-        }
-
-        let title = path
-            .file_stem()
-            .and_then(|s| s.to_str())
-            .unwrap_or("Unknown")
-            .to_string();
-
-        let book = Book {
-            id: book_id.clone(),
-            title: title.clone(),
-            total_words: words.len(),
-            progress: 0,
-        };
         self.library.books.push(book);
-        save_library(&self.library);
-
-        self.status_message = Some(format!("Loaded: {} ({} words)", title, words.len()));
-        self.load_book(&book_id);
-
-        true
+        self.book_index = index_books(&self.library.books);
+        self.open_words(&book_id, words);
+        self.flush_library(true);
     }
 
     fn save_progress(&mut self) {
         if let Some(ref book_id) = self.current_book_id {
-            if let Some(book) = self.library.books.iter_mut().find(|b| b.id == *book_id) {
+            if let Some(&i) = self.book_index.get(book_id) {
+                let book = &mut self.library.books[i];
+                // Nothing to write if the position hasn't moved since the last save
+                if book.progress == self.word_index {
+                    return;
+                }
                 book.progress = self.word_index;
             }
-            save_library(&self.library);
+            self.mark_library_dirty();
         }
     }
 }